@@ -4,7 +4,8 @@
 泛舟RPC服务器调试工具 - 自动启动脚本
 
 功能说明:
-1. 自动启动websocat代理，连接到指定的RPC服务器
+1. 自动启动WebSocket代理，连接到指定的RPC服务器
+   (已安装websockets时使用内置代理，否则使用websocat)
 2. 启动HTTP服务器托管Web调试界面
 3. 自动打开浏览器访问调试界面
 
@@ -12,34 +13,455 @@
     python3 launch_web.py                    # 使用默认配置
     python3 launch_web.py --host 192.168.0.104  # 指定RPC服务器地址
     python3 launch_web.py --rpc-port 12345 --ws-port 12346 --http-port 8080
+    python3 launch_web.py --websocat         # 强制使用websocat代理
 
 依赖:
-    - websocat: 需要预先安装，下载地址 https://github.com/vi/websocat/releases
-    - Python 3.6+
+    - websockets (推荐): pip install websockets
+    - websocat (可选): 未安装websockets时使用，下载地址 https://github.com/vi/websocat/releases
+    - Python 3.7+ (3.8+ 在Linux上使用posix_spawn启动websocat，速度更快)
+
+预压缩资源:
+    Web目录中存在 xxx.js.gz / xxx.js.br 等预压缩文件且不旧于原文件时，
+    会按浏览器的Accept-Encoding直接发送压缩文件，例如:
+    gzip -k -9 dist/*.html dist/js/*.js dist/css/*.css
 """
 
+# asyncio、websockets、subprocess、webbrowser等较重的模块在使用时才导入，
+# 使 --help 及参数错误等路径尽快返回
 import argparse
+import collections
+import datetime
+import email.utils
+import functools
 import http.server
+import importlib.util
+import io
 import os
-import platform
+import queue
+import select
+import shutil
 import signal
-import socketserver
-import subprocess
+import socket
+import stat
 import sys
 import threading
 import time
-import webbrowser
+import urllib.parse
+from http import HTTPStatus
 from pathlib import Path
 
+# 是否为Windows平台
+IS_WINDOWS = os.name == "nt"
+
+# RPC服务器单条响应的最大长度
+RPC_LINE_LIMIT = 16 * 1024 * 1024
+
+
+def wait_port(port, timeout=2.0, process=None):
+    """
+    等待本地端口可连接
+
+    Args:
+        port: 本地端口
+        timeout: 最长等待时间(秒)
+        process: 提供该端口的子进程，进程退出时立即停止等待
+
+    Returns:
+        端口是否已就绪
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.05):
+                return True
+        except OSError:
+            pass
+        if process is not None and process.poll() is not None:
+            return False
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+
+
+def bind_port(port):
+    """
+    绑定并监听本地端口
+
+    Args:
+        port: 本地端口
+
+    Returns:
+        已处于监听状态的socket
+
+    Raises:
+        OSError: 端口被占用等绑定失败情况
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        # Windows上SO_REUSEADDR允许抢占已被占用的端口，因此仅在其他平台启用
+        if not IS_WINDOWS:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("", port))
+        # 立即监听，使端口在服务启动前就被独占
+        sock.listen()
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class StaticFileCache:
+    """
+    小文件内存缓存 (LRU)
+
+    按路径缓存文件内容，文件修改时间或大小变化后自动失效
+    """
+
+    def __init__(self, max_entries=64, max_file_size=100 * 1024):
+        """
+        Args:
+            max_entries: 最多缓存的文件数
+            max_file_size: 可缓存的最大文件大小(字节)
+        """
+        self.max_entries = max_entries
+        self.max_file_size = max_file_size
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def open(self, path, st):
+        """
+        打开文件，小文件优先从缓存读取
+
+        Args:
+            path: 文件路径
+            st: 文件的os.stat结果，用于查找缓存
+
+        Returns:
+            (文件对象, 内容对应的os.stat结果, 内容长度)
+            返回的stat结果及长度与文件对象的内容一致，即使文件在此期间被修改
+
+        Raises:
+            OSError: 文件无法打开
+        """
+        key = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == key:
+                self.entries.move_to_end(path)
+                _, fs, data = entry
+                return io.BytesIO(data), fs, len(data)
+
+        f = open(path, "rb")
+        try:
+            fs = os.fstat(f.fileno())
+            if fs.st_size > self.max_file_size:
+                return f, fs, fs.st_size
+            data = f.read()
+        except Exception:
+            f.close()
+            raise
+        f.close()
+
+        # 读取期间文件被改写时内容与stat不一致，不缓存
+        if len(data) == fs.st_size:
+            with self.lock:
+                self.entries[path] = ((fs.st_mtime_ns, fs.st_size), fs, data)
+                self.entries.move_to_end(path)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return io.BytesIO(data), fs, len(data)
+
+
+class WebRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    静态文件请求处理类
+
+    客户端支持时直接发送预压缩的 .br / .gz 文件；
+    发送Cache-Control和ETag，文件未修改时返回304；
+    小文件内容缓存在内存中，避免每次请求都读取磁盘
+    """
+
+    # (Content-Encoding, 预压缩文件后缀)，按优先级排列
+    precompressed_encodings = (("br", ".br"), ("gzip", ".gz"))
+
+    # 缓存过期后浏览器通过ETag重新验证
+    cache_control = "public, max-age=60, must-revalidate"
+
+    # 所有请求共享的小文件缓存
+    file_cache = StaticFileCache()
+
+    # 连接空闲超时(秒)，避免只建立连接不发请求的客户端长期占用工作线程
+    timeout = 10
+
+    def send_head(self):
+        """
+        发送响应头，返回待发送的文件对象
+        """
+        resolved = self.resolve_file()
+        if resolved is None:
+            return super().send_head()
+
+        path, st = resolved
+        file_path, encoding = path, None
+        precompressed = self.find_precompressed(path, st.st_mtime)
+        if precompressed is not None:
+            file_path, encoding, st = precompressed
+
+        etag = self.make_etag(st)
+        if self.etag_matches(etag) or self.not_modified_since(st):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_cache_headers(etag)
+            self.end_headers()
+            return None
+
+        try:
+            f, fs, length = self.file_cache.open(file_path, st)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        try:
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-type", self.guess_type(path))
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            self.send_header("Content-Length", str(length))
+            self.send_header("Last-Modified", self.date_time_string(fs.st_mtime))
+            self.send_cache_headers(self.make_etag(fs))
+            self.end_headers()
+            return f
+        except Exception:
+            f.close()
+            raise
+
+    def make_etag(self, st):
+        """
+        根据文件修改时间和大小生成弱ETag
+        """
+        return f'W/"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+    def send_cache_headers(self, etag):
+        """
+        发送缓存相关响应头
+        """
+        self.send_header("Cache-Control", self.cache_control)
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+
+    def etag_matches(self, etag):
+        """
+        检查If-None-Match请求头是否与ETag匹配 (弱比较)
+        """
+        header = self.headers.get("If-None-Match")
+        if not header:
+            return False
+        if header.strip() == "*":
+            return True
+
+        def opaque(tag):
+            tag = tag.strip()
+            return tag[2:] if tag.startswith("W/") else tag
+
+        return opaque(etag) in {opaque(tag) for tag in header.split(",")}
+
+    def not_modified_since(self, st):
+        """
+        检查If-Modified-Since请求头 (与SimpleHTTPRequestHandler一致)
+
+        存在If-None-Match时以ETag为准，不检查此请求头
+        """
+        if "If-Modified-Since" not in self.headers or "If-None-Match" in self.headers:
+            return False
+        try:
+            ims = email.utils.parsedate_to_datetime(self.headers["If-Modified-Since"])
+        except (TypeError, IndexError, OverflowError, ValueError):
+            return False
+
+        if ims.tzinfo is None:
+            ims = ims.replace(tzinfo=datetime.timezone.utc)
+        if ims.tzinfo is not datetime.timezone.utc:
+            return False
+        last_modified = datetime.datetime.fromtimestamp(st.st_mtime, datetime.timezone.utc)
+        return last_modified.replace(microsecond=0) <= ims
+
+    def resolve_file(self):
+        """
+        获取请求对应的普通文件路径
+
+        Returns:
+            (文件路径, os.stat结果)；目录重定向、目录列表及文件不存在时返回None，交由父类处理
+        """
+        path = self.translate_path(self.path)
+        try:
+            st = os.stat(path)
+            if stat.S_ISDIR(st.st_mode):
+                if not urllib.parse.urlsplit(self.path).path.endswith("/"):
+                    return None
+                path = os.path.join(path, "index.html")
+                st = os.stat(path)
+        except OSError:
+            return None
+        if path.endswith("/") or not stat.S_ISREG(st.st_mode):
+            return None
+        return path, st
+
+    def find_precompressed(self, path, mtime):
+        """
+        查找客户端可接受且不旧于原文件的预压缩文件
+
+        Args:
+            path: 原文件路径
+            mtime: 原文件修改时间
+
+        Returns:
+            (预压缩文件路径, Content-Encoding, 预压缩文件的os.stat结果)，没有可用文件时返回None
+        """
+        accepted = self.accepted_encodings()
+        if not accepted:
+            return None
+
+        for encoding, suffix in self.precompressed_encodings:
+            if encoding not in accepted:
+                continue
+            try:
+                st = os.stat(path + suffix)
+            except OSError:
+                continue
+            if st.st_mtime >= mtime:
+                return path + suffix, encoding, st
+        return None
+
+    def accepted_encodings(self):
+        """
+        解析Accept-Encoding请求头
+
+        Returns:
+            客户端可接受的编码集合 (不含q=0的编码)
+        """
+        encodings = set()
+        for item in self.headers.get("Accept-Encoding", "").split(","):
+            name, _, params = item.partition(";")
+            name = name.strip().lower()
+            if not name:
+                continue
+            q = 1.0
+            for param in params.split(";"):
+                key, _, value = param.partition("=")
+                if key.strip().lower() == "q":
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            if q > 0:
+                encodings.add(name)
+        return encodings
+
+
+class WebHTTPServer(http.server.HTTPServer):
+    """
+    线程池HTTP服务器
+
+    连接放入队列，由固定数量的守护工作线程处理，浏览器可并发加载HTML/JS/CSS等资源，
+    且不会为每个请求新建线程；
+    启用SO_REUSEADDR，避免重启时端口仍处于TIME_WAIT状态导致绑定失败
+    """
+
+    allow_reuse_address = True
+    max_workers = 8
+
+    def __init__(self, server_address, handler_class, sock=None):
+        """
+        Args:
+            server_address: 监听地址
+            handler_class: 请求处理类
+            sock: 预先绑定的socket，为None时自行绑定server_address
+        """
+        self.requests = queue.Queue()
+        self.active_requests = set()
+        self.active_lock = threading.Lock()
+
+        if sock is None:
+            super().__init__(server_address, handler_class)
+        else:
+            super().__init__(server_address, handler_class, bind_and_activate=False)
+            self.socket.close()
+            self.socket = sock
+            self.server_address = sock.getsockname()
+            self.server_name, self.server_port = self.server_address[:2]
+            try:
+                self.server_activate()
+            except OSError:
+                self.server_close()
+                raise
+
+        # 工作线程设为守护线程，未结束的连接不会阻止进程退出
+        for i in range(self.max_workers):
+            worker = threading.Thread(target=self.process_request_worker, name=f"http-{i}")
+            worker.daemon = True
+            worker.start()
+
+    def process_request(self, request, client_address):
+        """
+        将连接放入队列，交给工作线程处理
+        """
+        self.requests.put((request, client_address))
+
+    def process_request_worker(self):
+        """
+        工作线程入口，依次处理队列中的连接，收到None时退出
+        """
+        while True:
+            item = self.requests.get()
+            if item is None:
+                break
+
+            request, client_address = item
+            with self.active_lock:
+                self.active_requests.add(request)
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                with self.active_lock:
+                    self.active_requests.discard(request)
+                self.shutdown_request(request)
+
+    def server_close(self):
+        """
+        关闭监听socket，并关闭排队中和处理中的连接
+        """
+        super().server_close()
+
+        while True:
+            try:
+                item = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self.shutdown_request(item[0])
+
+        # 中断处理中的连接，工作线程随后自行关闭这些连接
+        with self.active_lock:
+            for request in self.active_requests:
+                try:
+                    request.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+        for _ in range(self.max_workers):
+            self.requests.put(None)
+
 
 class WebLauncher:
     """
     Web调试工具启动器类
 
-    负责管理websocat代理进程和HTTP服务器
+    负责管理WebSocket代理和HTTP服务器
     """
 
-    def __init__(self, rpc_host, rpc_port, ws_port, http_port, web_dir):
+    def __init__(self, rpc_host, rpc_port, ws_port, http_port, web_dir,
+                 use_websocat=False, coalesce_ms=1.0):
         """
         初始化启动器
 
@@ -49,51 +471,329 @@ class WebLauncher:
             ws_port: WebSocket代理监听端口
             http_port: HTTP服务器端口
             web_dir: Web文件目录
+            use_websocat: 是否强制使用websocat代理
+            coalesce_ms: 内置代理合并发送的时间窗口(毫秒)，0表示不合并
         """
         self.rpc_host = rpc_host
+        self.rpc_host_ip = rpc_host
         self.rpc_port = rpc_port
         self.ws_port = ws_port
         self.http_port = http_port
         self.web_dir = web_dir
+        self.use_websocat = use_websocat
+        self.coalesce_ms = coalesce_ms
+        self.http_socket = None
+        self.ws_socket = None
+        self.ws_loop = None
+        self.ws_stop = None
+        self.ws_thread = None
+        self.ws_error = None
         self.websocat_process = None
+        self.websocat_stderr = collections.deque(maxlen=50)
+        self.stderr_thread = None
         self.http_server = None
         self.running = False
 
-    def find_websocat(self):
+        # 信号及后台线程通过写入wakeup_writer唤醒阻塞在wakeup_reader上的主线程
+        self.wakeup_reader, self.wakeup_writer = socket.socketpair()
+        self.wakeup_writer.setblocking(False)
+        self.signal_handlers_installed = False
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def find_websocat():
         """
-        查找websocat可执行文件
+        查找websocat可执行文件 (结果会被缓存)
 
         Returns:
             websocat路径，如果未找到则返回None
         """
-        # 常见的安装位置
+        # 优先在系统PATH中查找
+        path = shutil.which("websocat")
+        if path:
+            return path
+
+        # 常见的安装位置 (Windows平台添加.exe后缀)
+        suffix = ".exe" if IS_WINDOWS else ""
         paths_to_check = [
-            "websocat",  # 系统PATH中
-            "/usr/local/bin/websocat",
-            "/usr/bin/websocat",
-            os.path.expanduser("~/.local/bin/websocat"),
-            os.path.expanduser("~/bin/websocat"),
+            path + suffix
+            for path in (
+                "/usr/local/bin/websocat",
+                "/usr/bin/websocat",
+                os.path.expanduser("~/.local/bin/websocat"),
+                os.path.expanduser("~/bin/websocat"),
+            )
         ]
 
-        # Windows平台添加.exe后缀
-        if platform.system() == "Windows":
-            paths_to_check = [p + ".exe" for p in paths_to_check]
-
         for path in paths_to_check:
             if os.path.isfile(path) and os.access(path, os.X_OK):
                 return path
-            # 检查系统PATH
-            if path == "websocat" or path == "websocat.exe":
-                result = subprocess.run(
-                    ["which" if platform.system() != "Windows" else "where", path],
-                    capture_output=True,
-                    text=True,
-                )
-                if result.returncode == 0:
-                    return result.stdout.strip().split("\n")[0]
 
         return None
 
+    def use_builtin_bridge(self):
+        """
+        是否使用内置WebSocket代理
+        """
+        if self.use_websocat:
+            return False
+        return importlib.util.find_spec("websockets") is not None
+
+    def bind_sockets(self):
+        """
+        在启动任何服务之前绑定HTTP和WebSocket端口，任一端口被占用时立即失败
+
+        Returns:
+            是否全部绑定成功
+        """
+        port = self.http_port
+        try:
+            self.http_socket = bind_port(port)
+            port = self.ws_port
+            self.ws_socket = bind_port(port)
+        except OSError as e:
+            self.close_sockets()
+            if e.errno == 98 or e.errno == 48:  # Address already in use
+                print(f"\n❌ 端口 {port} 已被占用，请使用其他端口")
+            else:
+                print(f"\n❌ 绑定端口 {port} 失败: {e}")
+            return False
+
+        # websocat自行监听端口，这里只检查端口是否可用
+        if not self.use_builtin_bridge():
+            self.ws_socket.close()
+            self.ws_socket = None
+        return True
+
+    def close_sockets(self):
+        """
+        关闭预先绑定的socket
+        """
+        for sock in (self.http_socket, self.ws_socket):
+            if sock is not None:
+                sock.close()
+        self.http_socket = None
+        self.ws_socket = None
+
+    def start_ws_proxy(self):
+        """
+        启动WebSocket代理，优先使用内置代理
+
+        Returns:
+            是否成功启动
+        """
+        if not self.resolve_rpc_host():
+            return False
+
+        if self.use_builtin_bridge():
+            return self.start_ws_bridge()
+        return self.start_websocat()
+
+    def resolve_rpc_host(self):
+        """
+        预先解析RPC服务器地址，避免代理为每个连接重新解析
+
+        Returns:
+            是否解析成功
+        """
+        try:
+            infos = socket.getaddrinfo(self.rpc_host, self.rpc_port, type=socket.SOCK_STREAM)
+        except OSError as e:
+            print(f"\n❌ 无法解析RPC服务器地址 {self.rpc_host}: {e}")
+            return False
+
+        # 优先使用IPv4地址
+        infos.sort(key=lambda info: info[0] != socket.AF_INET)
+        self.rpc_host_ip = infos[0][4][0]
+        if self.rpc_host_ip != self.rpc_host:
+            print(f"\n🔎 RPC服务器地址: {self.rpc_host} -> {self.rpc_host_ip}")
+        return True
+
+    def format_rpc_host_ip(self):
+        """
+        返回可直接拼接端口的RPC服务器地址 (IPv6地址加方括号)
+        """
+        if ":" in self.rpc_host_ip:
+            return f"[{self.rpc_host_ip}]"
+        return self.rpc_host_ip
+
+    def is_ws_proxy_running(self):
+        """
+        检查WebSocket代理是否仍在运行
+        """
+        if self.websocat_process:
+            return self.websocat_process.poll() is None
+        return self.ws_thread is not None and self.ws_thread.is_alive()
+
+    def start_ws_bridge(self):
+        """
+        启动内置WebSocket代理
+
+        Returns:
+            是否成功启动
+        """
+        print(f"\n🔌 启动WebSocket代理 (内置)...")
+        print(f"   代理: ws://localhost:{self.ws_port} -> tcp://{self.rpc_host}:{self.rpc_port}")
+
+        # 在后台线程中运行事件循环，等待监听端口就绪
+        ready = threading.Event()
+        self.ws_thread = threading.Thread(target=self.run_ws_bridge, args=(ready,))
+        self.ws_thread.daemon = True
+        self.ws_thread.start()
+        ready.wait()
+
+        if self.ws_error:
+            print(f"\n❌ WebSocket代理启动失败: {self.ws_error}")
+            return False
+
+        print("   ✅ WebSocket代理已启动")
+        return True
+
+    def run_ws_bridge(self, ready):
+        """
+        WebSocket代理线程入口
+
+        Args:
+            ready: 监听成功或失败后置位的事件
+        """
+        import asyncio
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.ws_loop = loop
+        try:
+            loop.run_until_complete(self.serve_ws_bridge(ready))
+        except Exception as e:
+            self.ws_error = e
+        finally:
+            ready.set()
+            loop.close()
+            self.wakeup()
+
+    async def serve_ws_bridge(self, ready):
+        """
+        监听WebSocket端口，直到stop()被调用
+        """
+        import asyncio
+        import websockets
+
+        self.ws_stop = asyncio.get_running_loop().create_future()
+        async with websockets.serve(self.bridge, sock=self.ws_socket):
+            ready.set()
+            await self.ws_stop
+
+    def stop_ws_bridge(self):
+        """
+        通知事件循环停止WebSocket代理 (可在任意线程调用)
+        """
+        def request_stop():
+            if not self.ws_stop.done():
+                self.ws_stop.set_result(None)
+
+        try:
+            self.ws_loop.call_soon_threadsafe(request_stop)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    async def bridge(self, ws, path=None):
+        """
+        转发单个WebSocket客户端与RPC服务器之间的数据
+
+        Args:
+            ws: WebSocket连接
+            path: 请求路径 (旧版websockets传入，未使用)
+        """
+        import asyncio
+
+        try:
+            reader, writer = await asyncio.open_connection(
+                self.rpc_host_ip, self.rpc_port, limit=RPC_LINE_LIMIT
+            )
+        except OSError as e:
+            print(f"\n⚠️ 无法连接RPC服务器 {self.rpc_host}:{self.rpc_port}: {e}")
+            await ws.close(code=1011, reason="RPC server unreachable")
+            return
+
+        # 关闭Nagle算法避免小包延迟 (asyncio默认已设置，此处显式保证)；
+        # 收发缓冲区交由内核自动调节，手动设置SO_SNDBUF/SO_RCVBUF反而会关闭自动调节
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        tasks = [
+            asyncio.ensure_future(self.ws_to_tcp(ws, writer)),
+            asyncio.ensure_future(self.tcp_to_ws(reader, ws)),
+        ]
+        try:
+            # 任意方向断开后关闭另一方向
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+            await ws.close()
+
+    async def ws_to_tcp(self, ws, writer):
+        """
+        WebSocket消息 -> RPC服务器，每条消息以换行结尾 (与websocat --text一致)
+
+        收到消息后在coalesce_ms窗口内继续接收，合并为一次写入，减少send()系统调用
+        """
+        import asyncio
+        from websockets.exceptions import ConnectionClosed
+
+        loop = asyncio.get_running_loop()
+        pending = bytearray()
+
+        def append(message):
+            if isinstance(message, str):
+                message = message.encode("utf-8")
+            pending.extend(message)
+            # RPC服务器按行解析请求，补齐缺少的换行
+            if not message.endswith(b"\n"):
+                pending.extend(b"\n")
+
+        try:
+            while True:
+                append(await ws.recv())
+
+                deadline = loop.time() + self.coalesce_ms / 1000
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        append(await asyncio.wait_for(ws.recv(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+                writer.write(bytes(pending))
+                pending.clear()
+                await writer.drain()
+        except ConnectionClosed:
+            # 客户端断开前收到的消息仍需转发
+            if pending:
+                writer.write(bytes(pending))
+
+    async def tcp_to_ws(self, reader, ws):
+        """
+        RPC服务器 -> WebSocket消息，每行响应作为一条文本消息
+        """
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                print(f"\n⚠️ RPC服务器响应超过 {RPC_LINE_LIMIT} 字节，已断开该WebSocket连接")
+                await ws.close(code=1009, reason="RPC response too large")
+                break
+            if not line:
+                break
+            line = line.rstrip(b"\r\n")
+            if line:
+                await ws.send(line.decode("utf-8", errors="replace"))
+
     def start_websocat(self):
         """
         启动websocat代理
@@ -101,10 +801,13 @@ class WebLauncher:
         Returns:
             是否成功启动
         """
+        import subprocess
+
         websocat_path = self.find_websocat()
 
         if not websocat_path:
-            print("\n⚠️  未找到websocat，请先安装websocat")
+            print("\n⚠️  未找到websocat，请先安装websockets或websocat")
+            print("   内置代理: pip install websockets")
             print("   下载地址: https://github.com/vi/websocat/releases")
             print("\n   安装示例:")
             print("   Linux: sudo mv websocat.x86_64-unknown-linux-musl /usr/local/bin/websocat && sudo chmod +x /usr/local/bin/websocat")
@@ -117,7 +820,7 @@ class WebLauncher:
             websocat_path,
             "--text",
             f"ws-l:0.0.0.0:{self.ws_port}",
-            f"tcp:{self.rpc_host}:{self.rpc_port}",
+            f"tcp:{self.format_rpc_host_ip()}:{self.rpc_port}",
         ]
 
         print(f"\n🔌 启动WebSocket代理...")
@@ -126,18 +829,34 @@ class WebLauncher:
 
         try:
             # 启动websocat进程
+            # websocat使用绝对路径且不关闭继承的fd (Python创建的fd默认不可继承)，
+            # 满足条件时Python 3.8+会使用posix_spawn代替fork+exec
             self.websocat_process = subprocess.Popen(
                 cmd,
-                stdout=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
                 stderr=subprocess.PIPE,
+                close_fds=False,
             )
-            # 等待一小段时间检查是否启动成功
-            time.sleep(0.5)
+            # 在后台线程中持续读取错误输出，防止管道写满阻塞websocat
+            self.stderr_thread = threading.Thread(target=self.drain_websocat_stderr)
+            self.stderr_thread.daemon = True
+            self.stderr_thread.start()
+
+            # 等待代理端口就绪，检查是否启动成功
+            ready = wait_port(self.ws_port, process=self.websocat_process)
             if self.websocat_process.poll() is not None:
                 # 进程已退出，读取错误信息
-                stderr = self.websocat_process.stderr.read().decode("utf-8")
+                self.stderr_thread.join(timeout=1)
+                stderr = "".join(self.websocat_stderr)
                 print(f"\n❌ websocat启动失败: {stderr}")
                 return False
+            if not ready:
+                print(f"   ⚠️ 等待WebSocket代理端口 {self.ws_port} 就绪超时")
+
+            # 在后台线程中等待websocat退出
+            watcher_thread = threading.Thread(target=self.watch_websocat)
+            watcher_thread.daemon = True
+            watcher_thread.start()
 
             print(f"   ✅ WebSocket代理已启动 (PID: {self.websocat_process.pid})")
             return True
@@ -149,6 +868,20 @@ class WebLauncher:
             print(f"\n❌ 启动websocat时发生错误: {e}")
             return False
 
+    def drain_websocat_stderr(self):
+        """
+        读取websocat的错误输出，仅保留最近的若干行
+        """
+        for line in self.websocat_process.stderr:
+            self.websocat_stderr.append(line.decode("utf-8", errors="replace"))
+
+    def watch_websocat(self):
+        """
+        等待websocat进程退出并通知主线程
+        """
+        self.websocat_process.wait()
+        self.wakeup()
+
     def start_http_server(self):
         """
         启动HTTP服务器
@@ -156,12 +889,16 @@ class WebLauncher:
         Returns:
             是否成功启动
         """
-        os.chdir(self.web_dir)
-
-        handler = http.server.SimpleHTTPRequestHandler
+        # 通过directory参数指定托管目录，避免修改进程工作目录
+        handler = functools.partial(
+            WebRequestHandler,
+            directory=self.web_dir,
+        )
 
         try:
-            self.http_server = socketserver.TCPServer(("", self.http_port), handler)
+            self.http_server = WebHTTPServer(
+                ("", self.http_port), handler, sock=self.http_socket
+            )
             print(f"\n🌐 启动HTTP服务器...")
             print(f"   目录: {self.web_dir}")
             print(f"   地址: http://localhost:{self.http_port}")
@@ -175,10 +912,7 @@ class WebLauncher:
             return True
 
         except OSError as e:
-            if e.errno == 98 or e.errno == 48:  # Address already in use
-                print(f"\n❌ 端口 {self.http_port} 已被占用，请使用其他端口")
-            else:
-                print(f"\n❌ 启动HTTP服务器失败: {e}")
+            print(f"\n❌ 启动HTTP服务器失败: {e}")
             return False
 
     def open_browser(self):
@@ -186,11 +920,13 @@ class WebLauncher:
         打开浏览器访问调试界面
         """
         url = f"http://localhost:{self.http_port}?host=localhost&port={self.ws_port}&autoconnect=true"
+        import webbrowser
+
         print(f"\n🚀 正在打开浏览器...")
         print(f"   URL: {url}")
 
-        # 等待一小段时间让服务器启动
-        time.sleep(0.5)
+        # 等待HTTP服务器就绪
+        wait_port(self.http_port)
 
         try:
             webbrowser.open(url)
@@ -205,7 +941,14 @@ class WebLauncher:
         """
         print("\n🛑 正在停止服务...")
 
+        if self.ws_thread:
+            self.stop_ws_bridge()
+            self.ws_thread.join(timeout=5)
+            print("   ✅ WebSocket代理已停止")
+
         if self.websocat_process:
+            import subprocess
+
             try:
                 self.websocat_process.terminate()
                 self.websocat_process.wait(timeout=5)
@@ -216,13 +959,95 @@ class WebLauncher:
 
         if self.http_server:
             self.http_server.shutdown()
+            self.http_server.server_close()
             print("   ✅ HTTP服务器已停止")
 
+        self.close_sockets()
+
+        self.release_wakeup()
         self.running = False
 
+    def install_signal_handlers(self):
+        """
+        设置信号处理 (需在主线程调用)
+
+        SIGINT/SIGTERM通过wakeup fd唤醒主线程，清理工作统一在主线程的run()中完成
+        """
+        signal.set_wakeup_fd(self.wakeup_writer.fileno())
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self.handle_signal)
+        self.signal_handlers_installed = True
+
+    def handle_signal(self, sig, frame):
+        """
+        信号处理函数
+
+        唤醒主线程由wakeup fd完成，这里只恢复默认处理，再次按Ctrl+C可强制退出
+        """
+        self.restore_signal_handlers()
+
+    def release_wakeup(self):
+        """
+        恢复信号处理并关闭唤醒socket (可重复调用)
+        """
+        if self.signal_handlers_installed:
+            signal.set_wakeup_fd(-1)
+            self.restore_signal_handlers()
+            self.signal_handlers_installed = False
+        self.wakeup_reader.close()
+        self.wakeup_writer.close()
+
+    def restore_signal_handlers(self):
+        """
+        恢复SIGINT/SIGTERM的默认处理
+        """
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    def wakeup_pending(self):
+        """
+        检查是否已收到信号或WebSocket代理已退出 (不阻塞)
+        """
+        readable, _, _ = select.select([self.wakeup_reader], [], [], 0)
+        return bool(readable)
+
+    def startup_interrupted(self):
+        """
+        启动过程中检查是否需要中止，需要时停止已启动的服务
+
+        Returns:
+            是否已中止启动
+        """
+        if not self.wakeup_pending():
+            return False
+        print("\n⚠️ 启动已中止")
+        self.stop()
+        return True
+
+    def wakeup(self):
+        """
+        唤醒等待中的主线程 (可在任意线程调用)
+        """
+        try:
+            self.wakeup_writer.send(b"\0")
+        except OSError:
+            # 缓冲区已满时主线程必然会被唤醒
+            pass
+
     def run(self):
         """
         运行启动器
+
+        无论从哪条路径返回，都会恢复信号处理并关闭唤醒socket
+        """
+        try:
+            return self.run_services()
+        finally:
+            self.release_wakeup()
+
+    def run_services(self):
+        """
+        启动所有服务并等待退出
         """
         print("=" * 60)
         print("   泛舟RPC服务器调试工具 - 自动启动脚本")
@@ -233,14 +1058,23 @@ class WebLauncher:
             print(f"\n❌ Web目录不存在: {self.web_dir}")
             return False
 
-        # 启动websocat代理
-        if not self.start_websocat():
+        # 预先绑定监听端口
+        if not self.bind_sockets():
+            return False
+
+        # 启动WebSocket代理
+        if not self.start_ws_proxy():
+            self.close_sockets()
+            return False
+        if self.startup_interrupted():
             return False
 
         # 启动HTTP服务器
         if not self.start_http_server():
             self.stop()
             return False
+        if self.startup_interrupted():
+            return False
 
         # 打开浏览器
         self.open_browser()
@@ -251,16 +1085,13 @@ class WebLauncher:
         print("   服务已启动，按 Ctrl+C 停止")
         print("=" * 60)
 
-        # 等待用户中断
-        try:
-            while self.running:
-                # 检查websocat进程是否仍在运行
-                if self.websocat_process.poll() is not None:
-                    print("\n⚠️ WebSocket代理已退出")
-                    break
-                time.sleep(1)
-        except KeyboardInterrupt:
-            pass
+        # 等待信号或WebSocket代理退出
+        self.wakeup_reader.recv(1)
+        # 检查WebSocket代理是否已退出
+        if not self.is_ws_proxy_running():
+            print("\n⚠️ WebSocket代理已退出")
+            if self.ws_error:
+                print(f"   错误: {self.ws_error}")
 
         self.stop()
         return True
@@ -284,7 +1115,8 @@ def main():
 
 说明:
   此脚本会启动两个服务:
-  1. websocat WebSocket代理 - 将WebSocket连接转发到RPC服务器的TCP端口
+  1. WebSocket代理 - 将WebSocket连接转发到RPC服务器的TCP端口
+     (已安装websockets时使用内置代理，否则使用websocat)
   2. HTTP服务器 - 托管Web调试界面
 
   然后自动打开浏览器访问调试界面。
@@ -324,6 +1156,19 @@ def main():
         help=f"Web文件目录 (默认: {script_dir})",
     )
 
+    parser.add_argument(
+        "--websocat",
+        action="store_true",
+        help="强制使用websocat代理，不使用内置代理",
+    )
+
+    parser.add_argument(
+        "--coalesce-ms",
+        type=float,
+        default=1.0,
+        help="内置代理合并发送的时间窗口，单位毫秒，0表示不合并 (默认: 1)",
+    )
+
     parser.add_argument(
         "--no-browser",
         action="store_true",
@@ -339,18 +1184,19 @@ def main():
         ws_port=args.ws_port,
         http_port=args.http_port,
         web_dir=args.web_dir,
+        use_websocat=args.websocat,
+        coalesce_ms=args.coalesce_ms,
     )
 
     # 设置信号处理
-    def signal_handler(sig, frame):
-        launcher.stop()
-        sys.exit(0)
-
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    launcher.install_signal_handlers()
 
-    # 运行启动器
-    success = launcher.run()
+    # 运行启动器，再次按Ctrl+C时强制退出
+    try:
+        success = launcher.run()
+    except KeyboardInterrupt:
+        print("\n⚠️ 已强制退出")
+        success = False
     sys.exit(0 if success else 1)
 
 